@@ -1,25 +1,72 @@
+import asyncio
+import bisect
+import codecs
 import csv
+import hashlib
 import httpx
+import orjson
 import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import re
 import json
+import ssl
+import weakref
 
 from io import StringIO
 from dotenv import load_dotenv
 from bson import ObjectId
-from fastapi import FastAPI, Body, UploadFile, File, HTTPException, Query
+from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
+from cachetools import TTLCache
+from fastapi import FastAPI, Body, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
+from pymongo import AsyncMongoClient
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from typing import List, Optional
 
-app = FastAPI()
+
+class ORJSONResponse(JSONResponse):
+    # orjson encodes several times faster than the stdlib json module
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str)
+
+
+app = FastAPI(default_response_class=ORJSONResponse)
 load_dotenv()
 
+# Sorted exercise titles served by /titles, populated lazily and kept current on insert;
+# titles_bytes/titles_etag hold the encoded response and are rebuilt only after the list changes.
+# titles_generation counts inserts so a fill that raced an insert is not cached.
+app.state.titles_cache = None
+app.state.titles_generation = 0
+app.state.titles_bytes = None
+app.state.titles_etag = None
+titles_cache_lock = asyncio.Lock()
+
+# Recent /exercises/search results keyed by title_norm, with a per-title lock so
+# concurrent searches for the same title share a single DB/Google lookup
+search_cache = TTLCache(maxsize=10_000, ttl=3600)
+search_locks = weakref.WeakValueDictionary()
+
+# /exercises/search-batch limits: titles per request, and Google/DB lookups in flight across requests
+SEARCH_BATCH_MAX_TITLES = 50
+search_batch_semaphore = asyncio.Semaphore(5)
+
+# Explicit origins (comma-separated) let the CORS middleware match by set lookup.
+# A "*" wildcard is only safe without credentials, so they are disabled in that case.
+FRONTEND_ORIGINS = [
+    origin.strip()
+    for origin in (os.getenv("FRONTEND_ORIGIN") or "http://localhost:3000").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # or ["http://localhost:3000", "http://your-ip:port"]
-    allow_credentials=True,
+    allow_origins=FRONTEND_ORIGINS,
+    allow_credentials="*" not in FRONTEND_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -37,25 +84,66 @@ DB_NAME = os.getenv("DB_NAME", "fit-check-db")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CX = os.getenv("GOOGLE_CX")
 
+# CSV uploads are read in fixed-size chunks; exercise CSVs are inserted one Arrow block at a time
+CSV_CHUNK_SIZE = 64 * 1024
+
+# One complete CSV record, following the csv module's quoting rules: a field is quoted only
+# when it starts with '"' (later quotes are literal), and a line break ends the record only
+# outside quotes. Possessive matching keeps an unterminated quote from being re-read as text.
+CSV_FIELD = r'(?:"(?:[^"]|"")*+"[^,\r\n]*|[^,\r\n"][^,\r\n]*|)'
+CSV_RECORD_RE = re.compile(rf'{CSV_FIELD}(?:,{CSV_FIELD})*+(?:\r\n|\n|\r(?=[^\n]))')
+CSV_BLOCK_SIZE = 1024 * 1024
+
+# Exercise CSV columns, all read as text except the numeric rating
+EXERCISE_CSV_TYPES = {
+    "Title": pa.string(),
+    "Desc": pa.string(),
+    "Type": pa.string(),
+    "BodyPart": pa.string(),
+    "Equipment": pa.string(),
+    "Level": pa.string(),
+    "Rating": pa.float64(),
+    "RatingDesc": pa.string(),
+}
+
+# SSL context built once and shared by the pooled HTTP client
+ssl_ctx = ssl.create_default_context()
+
+# Characters stripped from single-title lookups by clean_title (CSV batches use clean_titles)
+TITLE_STRIP_RE = re.compile(r'[^A-Za-z\s]')
+
 # Initialize MongoDB client with TLS configuration
-client = AsyncIOMotorClient(
+client = AsyncMongoClient(
     MONGO_URI,
     tls=True,
     tlsAllowInvalidCertificates=False,  # Never disable cert validation in production
+    maxPoolSize=50,
+    minPoolSize=10,  # Keep warm connections ready so the first requests don't pay for connects
     serverSelectionTimeoutMS=10000,
     connectTimeoutMS=20000,
     socketTimeoutMS=20000
 )
 
+
+class ObjectIdDecoder(TypeDecoder):
+    # Decode ObjectIds as strings while reading BSON, so documents are JSON-ready
+    bson_type = ObjectId
+
+    def transform_bson(self, value):
+        return str(value)
+
+
+codec_options = CodecOptions(type_registry=TypeRegistry([ObjectIdDecoder()]))
+
 db = client[DB_NAME]
-exerciseCollection = db["exercise"]
-routineCollection = db["routine"]
+exerciseCollection = db.get_collection("exercise", codec_options=codec_options)
+routineCollection = db.get_collection("routine", codec_options=codec_options)
 
 
 class RoutineModel(BaseModel):
-    name: str = Field(..., example="Full Body Workout")
-    description: Optional[str] = Field("", example="Covers all major muscle groups")
-    exercise_ids: List[str] = Field(default_factory=list, example=["609e129e8c8b0c6f78f6901f"])
+    name: str = Field(..., examples=["Full Body Workout"])
+    description: Optional[str] = Field("", examples=["Covers all major muscle groups"])
+    exercise_ids: List[str] = Field(default_factory=list, examples=[["609e129e8c8b0c6f78f6901f"]])
 
 @app.get("/")
 async def root():
@@ -70,8 +158,15 @@ async def say_hello(name: str):
 @app.on_event("startup")
 async def startup_event():
     global db_connected, fallback_routines
+    app.state.http = httpx.AsyncClient(
+        verify=ssl_ctx,
+        http2=True,  # Multiplex concurrent Google searches over one connection
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
     try:
-        await exerciseCollection.create_index("title")
+        await client.admin.command("ping")  # Connect eagerly so the pool warms up before traffic
+        await exerciseCollection.create_index([("title", 1)])
     except Exception as e:
         print(f"DB connection/index creation failed: {e}")
         db_connected = False
@@ -81,34 +176,140 @@ async def startup_event():
             print("Loaded fallback routines from JSON file.")
         except Exception as json_err:
             print(f"Failed to load fallback JSON file: {json_err}")
+        # Fallback routines never change, so encode the /routines response once
+        app.state.fallback_bytes = orjson.dumps({"routines": fallback_routines})
+        return
+
+    # Existing data may hold titles that collide once lowercased; that only
+    # disables the unique index, it doesn't mean the DB is unavailable
+    try:
+        await backfill_title_norm()
+        await exerciseCollection.create_index(
+            [("title_norm", 1)],
+            unique=True,
+            partialFilterExpression={"title_norm": {"$type": "string"}}
+        )
+    except Exception as e:
+        print(f"title_norm index creation failed: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await app.state.http.aclose()
+    await client.close()
 
 
 def clean_title(raw_title: str) -> str:
-    cleaned = re.sub(r'[^A-Za-z\s]', '', raw_title).strip().lower()
-    return ' '.join(word.capitalize() for word in cleaned.split())
+    # Drop non-letters, collapse whitespace, then title-case each word
+    return ' '.join(TITLE_STRIP_RE.sub('', raw_title).split()).title()
+
+
+def clean_titles(titles: pa.Array) -> pa.Array:
+    # Batch equivalent of clean_title, run through Arrow's compiled string kernels
+    titles = pc.replace_substring_regex(titles, r'[\s\x0b\x1c-\x1f\x85\p{Z}]+', ' ')
+    titles = pc.replace_substring_regex(titles, r'[^A-Za-z ]', '')
+    titles = pc.replace_substring_regex(titles, r' +', ' ')
+    return pc.utf8_title(pc.utf8_trim_whitespace(titles))
+
+
+def add_cached_titles(*titles: str):
+    # Keep the /titles cache sorted as new exercises are inserted
+    app.state.titles_generation += 1
+    if app.state.titles_cache is None:
+        return
+    for title in titles:
+        index = bisect.bisect_left(app.state.titles_cache, title)
+        if index == len(app.state.titles_cache) or app.state.titles_cache[index] != title:
+            app.state.titles_cache.insert(index, title)
+    app.state.titles_bytes = None
+
+
+async def insert_many_unordered(collection, documents: list) -> list:
+    # Unordered bulk insert that skips duplicate keys; returns the documents actually written.
+    # Any other write or write-concern error is re-raised.
+    try:
+        await collection.insert_many(documents, ordered=False)
+        return documents
+    except BulkWriteError as err:
+        errors = err.details.get("writeErrors", [])
+        if err.details.get("writeConcernErrors") or any(error.get("code") != 11000 for error in errors):
+            raise
+        return written_documents(documents, err)
+
+
+def written_documents(documents: list, err: BulkWriteError) -> list:
+    # Documents from an unordered insert_many that are not listed in writeErrors
+    failed = {error["index"] for error in err.details.get("writeErrors", [])}
+    return [document for index, document in enumerate(documents) if index not in failed]
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def cacheable_response(request: Request, body: bytes, etag: str) -> Response:
+    # JSON response with an ETag; answers 304 when the client already holds this version
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    # If-None-Match uses weak comparison (RFC 9110): ignore W/ prefixes, and * matches anything
+    tags = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if "*" in tags or etag in (tag.removeprefix("W/") for tag in tags):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def normalize_title(title: str) -> str:
+    # Lookup key stored as `title_norm` so title queries are exact index matches
+    return title.lower()
+
+
+async def backfill_title_norm():
+    # One-shot migration: derive `title_norm` for docs inserted before the field existed
+    result = await exerciseCollection.update_many(
+        {"title_norm": {"$exists": False}, "title": {"$type": "string"}},
+        [{"$set": {"title_norm": {"$toLower": "$title"}}}]
+    )
+    if result.modified_count:
+        print(f"Backfilled title_norm on {result.modified_count} exercises.")
 
 
 @app.get("/exercises/title")
 async def get_exercise_by_title(title: str = Query(..., description="Exact title to look up")):
     normalized_title = clean_title(title)
-    query = {"title": {"$regex": f"^{normalized_title}$", "$options": "i"}}
+    query = {"title_norm": normalize_title(normalized_title)}
 
     existing_doc = await exerciseCollection.find_one(query)
 
     if not existing_doc:
         raise HTTPException(status_code=404, detail="Exercise not found")
 
-    # Convert _id to string before returning
-    existing_doc["_id"] = str(existing_doc["_id"])
     return existing_doc
 
 
 @app.get("/exercises/search")
 async def search_google_images(title: str = Query(..., description="Exercise title to search or insert")):
     normalized_title = clean_title(title)
+    title_norm = normalize_title(normalized_title)
 
+    # Step 0: Serve recent results from memory (cached docs mirror the DB)
+    if (cached_doc := search_cache.get(title_norm)) is not None:
+        return {"source": "db", "exercise": cached_doc}
+
+    lock = search_locks.get(title_norm)
+    if lock is None:
+        lock = search_locks[title_norm] = asyncio.Lock()
+
+    async with lock:
+        if (cached_doc := search_cache.get(title_norm)) is not None:
+            return {"source": "db", "exercise": cached_doc}
+
+        response = await search_or_insert_exercise(normalized_title)
+        search_cache[title_norm] = response["exercise"]
+        return response
+
+
+async def search_or_insert_exercise(normalized_title: str):
     # Step 1: Search in DB
-    query = {"title": {"$regex": f"^{normalized_title}$", "$options": "i"}}
+    query = {"title_norm": normalize_title(normalized_title)}
     existing_doc = await exerciseCollection.find_one(query)
 
     if existing_doc:
@@ -116,7 +317,6 @@ async def search_google_images(title: str = Query(..., description="Exercise tit
 
         # Step 2: Return if gifs exist
         if searched_gifs:
-            existing_doc["_id"] = str(existing_doc["_id"])
             return {"source": "db", "exercise": existing_doc}
 
         # Step 3: Fetch from Google, update DB
@@ -124,14 +324,7 @@ async def search_google_images(title: str = Query(..., description="Exercise tit
         if not image_urls:
             raise HTTPException(status_code=404, detail="No images found for that title")
 
-        await exerciseCollection.update_one(query, {"$set": {
-            "searchedGifs": image_urls,
-            "gifUrl": image_urls[0]  # Optional main gif
-        }})
-
-        existing_doc["searchedGifs"] = image_urls
-        existing_doc["gifUrl"] = image_urls[0]
-        existing_doc["_id"] = str(existing_doc["_id"])
+        await store_searched_gifs(query, existing_doc, image_urls)
         return {"source": "google_update", "exercise": existing_doc}
 
     # Step 4: Not found in DB, fetch gifs and insert new document
@@ -141,6 +334,7 @@ async def search_google_images(title: str = Query(..., description="Exercise tit
 
     new_doc = {
         "title": normalized_title,
+        "title_norm": normalize_title(normalized_title),
         "description": "",
         "type": "",
         "body_part": "",
@@ -151,11 +345,30 @@ async def search_google_images(title: str = Query(..., description="Exercise tit
         "gifUrl": image_urls[0],
         "searchedGifs": image_urls,
     }
-    result = await exerciseCollection.insert_one(new_doc)
+    try:
+        result = await exerciseCollection.insert_one(new_doc)
+    except DuplicateKeyError:
+        # Lost an insert race against another worker or a CSV upload; serve the stored exercise
+        existing_doc = await exerciseCollection.find_one(query)
+        if existing_doc.get("searchedGifs"):
+            return {"source": "db", "exercise": existing_doc}
+        await store_searched_gifs(query, existing_doc, image_urls)
+        return {"source": "google_update", "exercise": existing_doc}
+    add_cached_titles(normalized_title)
     new_doc["_id"] = str(result.inserted_id)
     return {"source": "google_insert", "exercise": new_doc}
 
 
+async def store_searched_gifs(query: dict, existing_doc: dict, image_urls: List[str]):
+    await exerciseCollection.update_one(query, {"$set": {
+        "searchedGifs": image_urls,
+        "gifUrl": image_urls[0]  # Optional main gif
+    }})
+
+    existing_doc["searchedGifs"] = image_urls
+    existing_doc["gifUrl"] = image_urls[0]
+
+
 # Helper to fetch gifs from Google
 async def fetch_google_gif_urls(query_title: str):
     url = "https://www.googleapis.com/customsearch/v1"
@@ -166,12 +379,37 @@ async def fetch_google_gif_urls(query_title: str):
         "searchType": "image",
         "num": 10,
     }
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params)
-        if response.status_code != 200:
-            return []
-        data = response.json()
-        return [item["link"] for item in data.get("items", [])]
+    response = await app.state.http.get(url, params=params)
+    if response.status_code != 200:
+        return []
+    data = response.json()
+    return [item["link"] for item in data.get("items", [])]
+
+
+async def batch_search(titles: List[str]):
+    # Run searches concurrently (bounded by the semaphore); failures are returned in place rather than raised
+    async def search(title: str):
+        async with search_batch_semaphore:
+            return await search_google_images(title)
+
+    return await asyncio.gather(*(search(title) for title in titles), return_exceptions=True)
+
+
+@app.post("/exercises/search-batch")
+async def search_google_images_batch(
+    titles: List[str] = Body(..., max_length=SEARCH_BATCH_MAX_TITLES, description="Exercise titles to search or insert")
+):
+    results = []
+    for title, result in zip(titles, await batch_search(titles)):
+        if isinstance(result, HTTPException):
+            results.append({"title": title, "error": result.detail})
+        elif isinstance(result, httpx.HTTPError):
+            results.append({"title": title, "error": f"Image search failed: {result}"})
+        elif isinstance(result, Exception):
+            raise result
+        else:
+            results.append({"title": title, **result})
+    return {"results": results}
 
 
 @app.get("/exercises/{id}")
@@ -185,78 +423,195 @@ async def get_exercise_by_id(id: str):
     if not document:
         raise HTTPException(status_code=404, detail="Exercise not found")
 
-    document["_id"] = str(document["_id"])
     return document
 
 
 @app.get("/titles")
-async def get_exercises_titles():
-    cursor = exerciseCollection.find({}, {"title": 1, "_id": 0})  # Project only title field, exclude _id
-    titles = []
-    async for document in cursor:
-        titles.append(document["title"])
-    titles.sort()  # sort in-place
-    return {"titles": titles}
+async def get_exercises_titles(request: Request):
+    if app.state.titles_cache is None:
+        async with titles_cache_lock:
+            if app.state.titles_cache is None:
+                generation = app.state.titles_generation
+                # Sorting on the indexed title with a title-only projection makes this a covered index scan
+                cursor = exerciseCollection.find({}, {"title": 1, "_id": 0}).sort("title", 1).batch_size(1000)
+                documents = await cursor.to_list(length=None)
+                titles = [document["title"] for document in documents]
+                if app.state.titles_generation != generation:
+                    # An insert landed mid-read and may be missing; serve this result without caching it
+                    body = orjson.dumps({"titles": titles})
+                    return cacheable_response(request, body, body_etag(body))
+                app.state.titles_cache = titles
+    if app.state.titles_bytes is None:
+        app.state.titles_bytes = orjson.dumps({"titles": app.state.titles_cache})
+        app.state.titles_etag = body_etag(app.state.titles_bytes)
+    return cacheable_response(request, app.state.titles_bytes, app.state.titles_etag)
 
 
 @app.get("/exercises")
-async def get_exercises():
-    cursor = exerciseCollection.find()
-    exercises = []
-    async for document in cursor:
-        document["_id"] = str(document["_id"])
-        exercises.append(document)
-    return {"exercises": exercises}
+async def get_exercises(request: Request):
+    cursor = exerciseCollection.find().batch_size(1000)
+    exercises = await cursor.to_list(length=None)
+    # Encode straight to bytes, skipping FastAPI's jsonable_encoder pass
+    body = orjson.dumps({"exercises": exercises}, default=str)
+    return cacheable_response(request, body, body_etag(body))
+
+
+def complete_csv_length(buffer: str) -> int:
+    # Length of the leading run of complete records in buffer
+    end = 0
+    while match := CSV_RECORD_RE.match(buffer, end):
+        end = match.end()
+    return end
+
+
+async def iter_csv_rows(file: UploadFile):
+    # Stream an uploaded CSV as dict rows without holding the whole file in memory
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    header = None
+    eof = False
+    while not eof:
+        chunk = await file.read(CSV_CHUNK_SIZE)
+        eof = not chunk
+        buffer += decoder.decode(chunk, final=eof)
+
+        # Parse only complete records; the rest waits for the next chunk
+        cut = len(buffer) if eof else complete_csv_length(buffer)
+        if not cut:
+            continue
+        block, buffer = buffer[:cut], buffer[cut:]
+
+        for values in csv.reader(StringIO(block, newline="")):
+            if not values:
+                continue  # Skip blank lines like csv.DictReader
+            if header is None:
+                header = values
+                continue
+            yield dict(zip(header, values))
+
+
+def skip_overlong_row(row) -> str:
+    # Rows with extra trailing fields are skipped rather than failing the whole upload
+    return "skip" if row.actual_columns > row.expected_columns else "error"
+
+
+def open_exercise_csv(source) -> pacsv.CSVStreamingReader:
+    # Only the known columns are read (absent ones come back as nulls), so types of
+    # unrelated columns are never inferred from the first block
+    return pacsv.open_csv(
+        source,
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True, invalid_row_handler=skip_overlong_row),
+        convert_options=pacsv.ConvertOptions(
+            column_types=EXERCISE_CSV_TYPES,
+            include_columns=list(EXERCISE_CSV_TYPES),
+            include_missing_columns=True
+        )
+    )
+
+
+def csv_column(batch: pa.RecordBatch, name: str, default):
+    # Column with nulls (including absent columns) replaced by the default
+    return pc.fill_null(batch.column(name), default)
+
+
+def exercises_from_batch(batch: pa.RecordBatch) -> list:
+    # Clean and reshape the whole batch with Arrow kernels; dicts are only built for the insert
+    def text(name: str):
+        return pc.utf8_trim_whitespace(csv_column(batch, name, ""))
+
+    titles = clean_titles(csv_column(batch, "Title", ""))
+
+    # Clean keys to match DB schema
+    table = pa.table({
+        "title": titles,
+        "title_norm": pc.utf8_lower(titles),
+        "description": text("Desc"),
+        "type": text("Type"),
+        "body_part": text("BodyPart"),
+        "equipment": text("Equipment"),
+        "level": text("Level"),
+        "rating": csv_column(batch, "Rating", 0.0),
+        "rating_description": text("RatingDesc"),
+        "gifUrl": pa.array([""] * batch.num_rows),
+        "searchedGifs": pa.array([[]] * batch.num_rows, type=pa.list_(pa.string())),
+    })
+
+    # Skip empty titles; duplicates are rejected by the title_norm unique index
+    return table.filter(pc.not_equal(titles, "")).to_pylist()
+
+
+async def insert_exercise_batch(exercises: list) -> int:
+    try:
+        inserted = await insert_many_unordered(exerciseCollection, exercises)
+    except BulkWriteError as err:
+        # Keep the /titles cache in step with whatever did get written before failing
+        add_cached_titles(*(exercise["title"] for exercise in written_documents(exercises, err)))
+        raise
+    add_cached_titles(*(exercise["title"] for exercise in inserted))
+    return len(inserted)
+
+
+async def is_blank_upload(file: UploadFile) -> bool:
+    await file.seek(0)
+    while chunk := await file.read(CSV_CHUNK_SIZE):
+        if chunk.strip():
+            return False
+    return True
 
 
 @app.post("/exercises/upload-csv")
 async def upload_exercises_csv(file: UploadFile = File(...)):
-    # Read CSV content
-    content = await file.read()
-    decoded = content.decode('utf-8')
-    reader = csv.DictReader(StringIO(decoded))
-
-    # Convert CSV rows to list of dicts
-    seen_titles = set()
-    exercises = []
-    for row in reader:
-        # Clean keys to match DB schema
-        raw_title = row.get("Title", "").strip()
-
-        # Clean title: remove special chars/numbers, lowercase
-        cleaned = re.sub(r'[^A-Za-z\s]', '', raw_title).strip().lower()
-        formatted_title = ' '.join(word.capitalize() for word in cleaned.split())
-
-        if not formatted_title or formatted_title in seen_titles:
-            continue  # Skip empty or duplicate titles
-
-        seen_titles.add(formatted_title)
-
-        exercise = {
-            "title": formatted_title,
-            "description": row.get("Desc", "").strip(),
-            "type": row.get("Type", "").strip(),
-            "body_part": row.get("BodyPart", "").strip(),
-            "equipment": row.get("Equipment", "").strip(),
-            "level": row.get("Level", "").strip(),
-            "rating": float(row.get("Rating", 0.0)) if row.get("Rating") else 0.0,
-            "rating_description": row.get("RatingDesc", "").strip(),
-            "gifUrl": "",
-            "searchedGifs": []
-        }
-        exercises.append(exercise)
-
-    # Insert into MongoDB
-    if exercises:
-        result = await exerciseCollection.insert_many(exercises)
-        return {"inserted_count": len(result.inserted_ids)}
+    # Parse the upload block by block with Arrow's CSV reader, inserting each block as it is read
+    try:
+        reader = await asyncio.to_thread(open_exercise_csv, file.file)
+    except pa.ArrowInvalid as err:
+        # Arrow refuses files without a header line; those simply hold no exercises
+        if await is_blank_upload(file):
+            return {"message": "No exercises found in CSV"}
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {err}")
+
+    found_count = 0
+    inserted_count = 0
+    try:
+        batches = iter(reader)
+        while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+            exercises = exercises_from_batch(batch)
+            if exercises:
+                found_count += len(exercises)
+                inserted_count += await insert_exercise_batch(exercises)
+    except pa.ArrowInvalid as err:
+        # Earlier blocks are already committed; tell the client how many made it in
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid CSV: {err} ({inserted_count} exercises inserted before the error)"
+        )
+    except BulkWriteError as err:
+        inserted_count += len(written_documents(exercises, err))
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to insert exercises: {err} ({inserted_count} exercises inserted before the error)"
+        )
+
+    if found_count:
+        return {"inserted_count": inserted_count}
     else:
         return {"message": "No exercises found in CSV"}
 
 
 @app.post("/exercise")
 async def create_exercise(data: dict = Body(...)):
-    result = await exerciseCollection.insert_one(data)
+    if isinstance(data.get("title"), str):
+        data["title_norm"] = normalize_title(data["title"])
+    else:
+        data.pop("title_norm", None)  # Derived field; never stored without a title
+
+    try:
+        result = await exerciseCollection.insert_one(data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Exercise with that title already exists")
+    if isinstance(data.get("title"), str):
+        add_cached_titles(data["title"])
     return {"inserted_id": str(result.inserted_id)}
 
 
@@ -273,33 +628,33 @@ async def update_gif_url_by_id(data: dict = Body(...)):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid MongoDB ObjectId format.")
 
-    result = await exerciseCollection.update_one(
+    document = await exerciseCollection.find_one_and_update(
         {"_id": obj_id},
-        {"$set": {"gifUrl": gif_url}}
+        {"$set": {"gifUrl": gif_url}},
+        projection={"title_norm": 1}
     )
 
-    if result.matched_count == 0:
+    if document is None:
         raise HTTPException(status_code=404, detail=f"No exercise found with id '{exercise_id}'")
 
+    # Drop the stale search result so the new gif is served
+    search_cache.pop(document.get("title_norm"), None)
+
     return {"message": f"gifUrl updated for exercise with id '{exercise_id}'"}
 
 
 @app.get("/routines")
 async def get_routines():
     if not db_connected:
-        return {"routines": fallback_routines}
+        return Response(content=app.state.fallback_bytes, media_type="application/json")
 
-    routines = []
-    cursor = routineCollection.find()
-    async for document in cursor:
-        document["_id"] = str(document["_id"])
-        routines.append(document)
+    routines = await routineCollection.find().to_list(length=None)
     return {"routines": routines}
 
 
 @app.post("/routines")
 async def create_routine(routine: RoutineModel):
-    result = await routineCollection.insert_one(routine.dict())
+    result = await routineCollection.insert_one(routine.model_dump())
     return {"inserted_id": str(result.inserted_id)}
 
 
@@ -310,7 +665,7 @@ async def update_routine(id: str, updated_data: RoutineModel):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    result = await routineCollection.update_one({"_id": obj_id}, {"$set": updated_data.dict()})
+    result = await routineCollection.update_one({"_id": obj_id}, {"$set": updated_data.model_dump()})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Routine not found")
 
@@ -319,13 +674,9 @@ async def update_routine(id: str, updated_data: RoutineModel):
 
 @app.post("/routines/upload-csv")
 async def upload_routines_csv(file: UploadFile = File(...)):
-    content = await file.read()
-    decoded = content.decode("utf-8")
-    reader = csv.DictReader(StringIO(decoded))
-
     routine_map = {}
 
-    for row in reader:
+    async for row in iter_csv_rows(file):
         routine_name = row.get("Routine", "").strip()
         muscle_group = row.get("MuscleGroup", "").strip()
         exercise_title = row.get("Exercise", "").strip()
@@ -365,8 +716,8 @@ async def upload_routines_csv(file: UploadFile = File(...)):
     if not routines_to_insert:
         return {"message": "No valid routines found in CSV"}
 
-    result = await routineCollection.insert_many(routines_to_insert)
+    inserted = await insert_many_unordered(routineCollection, routines_to_insert)
     return {
-        "inserted_count": len(result.inserted_ids),
-        "inserted_ids": [str(id) for id in result.inserted_ids]
+        "inserted_count": len(inserted),
+        "inserted_ids": [str(routine["_id"]) for routine in inserted]
     }
\ No newline at end of file
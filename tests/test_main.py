@@ -0,0 +1,177 @@
+import asyncio
+import csv
+import sys
+from io import BytesIO, StringIO
+
+import pyarrow as pa
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from pymongo.errors import BulkWriteError
+
+from app import main
+
+
+def read_rows(data: bytes):
+    async def collect():
+        return [row async for row in main.iter_csv_rows(UploadFile(file=BytesIO(data)))]
+    return asyncio.run(collect())
+
+
+def expected_rows(data: bytes):
+    return [dict(row) for row in csv.DictReader(StringIO(data.decode("utf-8"), newline=""))]
+
+
+CSV_SAMPLES = [
+    # Quoted fields spanning lines, escaped quotes, CRLF and blank lines
+    b'Title,Desc\r\n"Push, Up","multi\nline ""quoted"" text"\r\n\r\nSquat,plain\r\n',
+    # Multibyte characters that land on chunk boundaries
+    "Title,Desc\nÉlan,Ünïcode 💪 désc\n\"Crunch\",\"ß\n€\"\n".encode("utf-8"),
+    # Control and Unicode separators are field content, not line breaks
+    "Routine,MuscleGroup,Exercise,Set\nA,Chest,Bench\x0cPress,10\nB,Back,Row\x85 Pull,8\n".encode("utf-8"),
+    # Final record without a trailing newline
+    b"Title,Desc\nLunge,last row",
+    # Quotes inside unquoted fields are literal and must not flip the quoting state
+    b'Routine,MuscleGroup,Exercise,Set\nA,Legs,Box 24" jump,1\nB,Back,Row,2\nC,Chest,"Bench\nPress",3\n'
+    b'D,Arms,"Curl ""21s""\r\nslow",4\nE,Core,"Plank"x"y,5\n',
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+@pytest.mark.parametrize("data", CSV_SAMPLES)
+def test_iter_csv_rows_matches_dictreader(monkeypatch, data, chunk_size):
+    monkeypatch.setattr(main, "CSV_CHUNK_SIZE", chunk_size)
+    assert read_rows(data) == expected_rows(data)
+
+
+def test_iter_csv_rows_empty_file():
+    assert read_rows(b"") == []
+
+
+def clean_titles_one(raw_title: str) -> str:
+    return main.clean_titles(pa.array([raw_title], type=pa.string()))[0].as_py()
+
+
+WHITESPACE = [chr(code) for code in range(sys.maxunicode + 1) if chr(code).isspace()]
+
+
+@pytest.mark.parametrize("raw_title", [
+    "  push-UP 2x ",
+    "bench\tpress",
+    "a 1 b",
+    "",
+    "Dumbbell   curl",
+    "ÉLAN x",
+    "o'neil",
+    *(f"Push{space}Up" for space in WHITESPACE),
+])
+def test_clean_titles_matches_clean_title(raw_title):
+    assert clean_titles_one(raw_title) == main.clean_title(raw_title)
+
+
+def test_search_batch_rejects_oversized_lists():
+    titles = [f"Exercise {index}" for index in range(main.SEARCH_BATCH_MAX_TITLES + 1)]
+    response = TestClient(main.app).post("/exercises/search-batch", json=titles)
+    assert response.status_code == 422
+
+
+def read_exercises(data: bytes, monkeypatch, block_size: int = 1024 * 1024):
+    monkeypatch.setattr(main, "CSV_BLOCK_SIZE", block_size)
+    reader = main.open_exercise_csv(BytesIO(data))
+    return [exercise for batch in reader for exercise in main.exercises_from_batch(batch)]
+
+
+def test_exercise_csv_ignores_types_of_unused_columns(monkeypatch):
+    rows = [f"Exercise {chr(65 + index % 26)},{index}" for index in range(2000)] + ["Late Row,not a number"]
+    data = ("Title,Notes\n" + "\n".join(rows) + "\n").encode("utf-8")
+    exercises = read_exercises(data, monkeypatch, block_size=4096)
+    assert len(exercises) == 2001
+    assert exercises[-1]["title"] == "Late Row"
+
+
+def test_exercise_csv_fills_missing_columns(monkeypatch):
+    exercises = read_exercises(b"Title,Rating\n  bench press 2 ,\n,4\nSquat,4.5\n", monkeypatch)
+    assert exercises == [
+        {
+            "title": "Bench Press",
+            "title_norm": "bench press",
+            "description": "",
+            "type": "",
+            "body_part": "",
+            "equipment": "",
+            "level": "",
+            "rating": 0.0,
+            "rating_description": "",
+            "gifUrl": "",
+            "searchedGifs": [],
+        },
+        {
+            "title": "Squat",
+            "title_norm": "squat",
+            "description": "",
+            "type": "",
+            "body_part": "",
+            "equipment": "",
+            "level": "",
+            "rating": 4.5,
+            "rating_description": "",
+            "gifUrl": "",
+            "searchedGifs": [],
+        },
+    ]
+
+
+@pytest.mark.parametrize("if_none_match, status_code", [
+    (None, 200),
+    ('"0000000000000000"', 200),
+    ("{etag}", 304),
+    ("W/{etag}", 304),
+    ('"0000000000000000", W/{etag}', 304),
+    ("*", 304),
+])
+def test_titles_etag_revalidation(monkeypatch, if_none_match, status_code):
+    monkeypatch.setattr(main.app.state, "titles_cache", ["Bench Press", "Squat"])
+    monkeypatch.setattr(main.app.state, "titles_bytes", None)
+    monkeypatch.setattr(main.app.state, "titles_etag", None)
+    client = TestClient(main.app)
+    etag = client.get("/titles").headers["etag"]
+
+    headers = {"If-None-Match": if_none_match.format(etag=etag)} if if_none_match else {}
+    response = client.get("/titles", headers=headers)
+    assert response.status_code == status_code
+    assert response.headers["etag"] == etag
+
+
+class FailingCollection:
+    # insert_many stand-in that writes every document except the first, then fails it
+    async def insert_many(self, documents, ordered=True):
+        raise BulkWriteError({
+            "writeErrors": [{"index": 0, "code": 2, "errmsg": "document failed validation"}],
+            "nInserted": len(documents) - 1,
+        })
+
+
+def test_exercise_upload_write_error_keeps_cache_and_count(monkeypatch):
+    monkeypatch.setattr(main, "exerciseCollection", FailingCollection())
+    monkeypatch.setattr(main.app.state, "titles_cache", ["Bench Press"])
+    monkeypatch.setattr(main.app.state, "titles_bytes", None)
+
+    files = {"file": ("exercises.csv", b"Title\nSquat\nLunge\nDeadlift\n", "text/csv")}
+    response = TestClient(main.app).post("/exercises/upload-csv", files=files)
+
+    assert response.status_code == 500
+    assert "(2 exercises inserted before the error)" in response.json()["detail"]
+    assert main.app.state.titles_cache == ["Bench Press", "Deadlift", "Lunge"]
+
+
+@pytest.mark.parametrize("data", [b"", b"\n", b"\r\n\n", b"Title,Desc\n"])
+def test_exercise_upload_without_rows(data):
+    files = {"file": ("exercises.csv", data, "text/csv")}
+    response = TestClient(main.app).post("/exercises/upload-csv", files=files)
+    assert response.status_code == 200
+    assert response.json() == {"message": "No exercises found in CSV"}
+
+
+def test_exercise_csv_skips_rows_with_extra_fields(monkeypatch):
+    exercises = read_exercises(b"Title,Desc\nSquat,legs,extra\nLunge,legs\n", monkeypatch)
+    assert [exercise["title"] for exercise in exercises] == ["Lunge"]